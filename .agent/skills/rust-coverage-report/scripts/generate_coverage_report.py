@@ -7,10 +7,19 @@ Usage:
     python3 generate_coverage_report.py coverage.json --output report.md
 """
 
+import functools
 import json
+import os
 import sys
 import argparse
+from operator import itemgetter
 from pathlib import Path
+from typing import TextIO
+
+try:
+    import orjson
+except ImportError:  # optional: faster parsing of large llvm-cov output
+    orjson = None
 
 
 def extract_crate_name(filename: str) -> str:
@@ -20,7 +29,8 @@ def extract_crate_name(filename: str) -> str:
     - /path/to/project/crates/my-crate/src/lib.rs -> my-crate
     - /path/to/project/src/lib.rs -> (project root)
     """
-    parts = Path(filename).parts
+    # Splitting the path dominates; files in the same directory share that work
+    parts = _dir_parts(os.path.dirname(filename)) + (os.path.basename(filename),)
     
     # Look for 'crates' directory pattern
     if 'crates' in parts:
@@ -37,6 +47,11 @@ def extract_crate_name(filename: str) -> str:
     return "unknown"
 
 
+@functools.lru_cache(maxsize=None)
+def _dir_parts(dir_path: str) -> tuple[str, ...]:
+    return Path(dir_path).parts
+
+
 def get_relative_path(filename: str, crate_name: str) -> str:
     """Get the file path relative to the crate root."""
     marker = f"crates/{crate_name}/"
@@ -51,10 +66,14 @@ def get_relative_path(filename: str, crate_name: str) -> str:
     return filename
 
 
-def generate_report(json_path: str) -> str:
-    """Generate markdown report from llvm-cov JSON output."""
-    with open(json_path, 'r') as f:
-        data = json.load(f)
+def generate_report(json_path: str, out: TextIO) -> None:
+    """Generate markdown report from llvm-cov JSON output, writing it to out."""
+    if orjson is not None:
+        with open(json_path, 'rb') as f:
+            data = orjson.loads(f.read())
+    else:
+        with open(json_path, 'r') as f:
+            data = json.load(f)
 
     # llvm-cov json format: { "data": [ { "files": [ ... ], "totals": {...} } ] }
     files = data['data'][0]['files']
@@ -85,14 +104,13 @@ def generate_report(json_path: str) -> str:
             'percent': lines['percent']
         })
 
-    # Build the report
-    lines = []
-    lines.append("# Code Coverage Report\n")
+    # Write the report line by line
+    out.write("# Code Coverage Report\n\n")
     
     # Summary table
-    lines.append("## Summary by Crate")
-    lines.append("| Crate | Covered Lines | Total Lines | Percentage |")
-    lines.append("| :--- | :--- | :--- | :--- |")
+    out.write("## Summary by Crate\n")
+    out.write("| Crate | Covered Lines | Total Lines | Percentage |\n")
+    out.write("| :--- | :--- | :--- | :--- |\n")
     
     # Sort crates by coverage percentage (descending)
     sorted_crates = sorted(
@@ -103,29 +121,30 @@ def generate_report(json_path: str) -> str:
     
     for crate_name, crate_data in sorted_crates:
         percent = (crate_data['covered'] / crate_data['count'] * 100) if crate_data['count'] > 0 else 0
-        lines.append(f"| **{crate_name}** | {crate_data['covered']} | {crate_data['count']} | **{percent:.2f}%** |")
+        out.write(f"| **{crate_name}** | {crate_data['covered']} | {crate_data['count']} | **{percent:.2f}%** |\n")
     
-    lines.append("")
+    out.write("\n")
     
     # Detailed per-crate sections
-    lines.append("---\n")
-    lines.append("## Detailed Coverage by File\n")
+    out.write("---\n\n")
+    out.write("## Detailed Coverage by File\n")
     
     for crate_name, crate_data in sorted_crates:
         percent = (crate_data['covered'] / crate_data['count'] * 100) if crate_data['count'] > 0 else 0
         
-        lines.append(f"<details>")
-        lines.append(f"<summary><b>{crate_name} ({percent:.2f}%)</b></summary>\n")
-        lines.append("| File | Covered Lines | Total Lines | Percentage |")
-        lines.append("| :--- | :--- | :--- | :--- |")
+        # Blank line between sections but not after the last one
+        out.write(f"\n<details>\n")
+        out.write(f"<summary><b>{crate_name} ({percent:.2f}%)</b></summary>\n\n")
+        out.write("| File | Covered Lines | Total Lines | Percentage |\n")
+        out.write("| :--- | :--- | :--- | :--- |\n")
         
         # Sort files by name
-        for file_info in sorted(crate_data['files'], key=lambda x: x['name']):
-            lines.append(f"| {file_info['name']} | {file_info['covered']} | {file_info['count']} | {file_info['percent']:.2f}% |")
+        out.writelines(
+            f"| {file_info['name']} | {file_info['covered']} | {file_info['count']} | {file_info['percent']:.2f}% |\n"
+            for file_info in sorted(crate_data['files'], key=itemgetter('name'))
+        )
         
-        lines.append("</details>\n")
-    
-    return "\n".join(lines)
+        out.write("</details>\n")
 
 
 def main():
@@ -147,14 +166,13 @@ def main():
         print(f"Error: File not found: {args.json_file}", file=sys.stderr)
         sys.exit(1)
     
-    report = generate_report(args.json_file)
-    
     if args.output:
-        with open(args.output, 'w') as f:
-            f.write(report)
+        with open(args.output, 'w', buffering=1 << 20) as f:
+            generate_report(args.json_file, f)
         print(f"Report written to {args.output}")
     else:
-        print(report)
+        generate_report(args.json_file, sys.stdout)
+        print()  # stdout output ends with a blank line
 
 
 if __name__ == "__main__":
@@ -9,7 +9,7 @@ This script extracts a small subset of records from ALL FCC data files that:
 4. Is deterministic (same input produces same output)
 
 Usage:
-    python extract_test_fixture.py <cache_dir> <output_dir> [--count N]
+    python extract_test_fixture.py <cache_dir> <output_dir> [--count N] [--jobs N]
 
 Example:
     python extract_test_fixture.py ~/.cache/uls tests/fixtures/fcc-sample
@@ -19,29 +19,40 @@ and extracts samples from each.
 """
 
 import argparse
+import functools
+import math
 import os
 import random
+import re
 import sys
 import zipfile
-from collections import defaultdict
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
+from string import ascii_uppercase
 from tempfile import TemporaryDirectory
+from typing import BinaryIO
 
 
-# Known record types and their USI field position (0-indexed)
-RECORD_TYPES = {
-    'HD': 1,  # Header/License
-    'EN': 1,  # Entity
-    'AM': 1,  # Amateur
-    'HS': 1,  # History
-    'CO': 1,  # Comments
-    'SC': 1,  # Special Conditions
-    'LA': 1,  # License Attachment
-    'SF': 1,  # License Free Form Special Condition
-}
+# Known record types, in extraction order; all carry the USI at field position 1
+RECORD_TYPES = (
+    'HD',  # Header/License
+    'EN',  # Entity
+    'AM',  # Amateur
+    'HS',  # History
+    'CO',  # Comments
+    'SC',  # Special Conditions
+    'LA',  # License Attachment
+    'SF',  # License Free Form Special Condition
+)
+
+# Valid record type prefixes for continuation detection (matched against raw bytes)
+VALID_RECORD_PREFIXES = {rt.encode() for rt in RECORD_TYPES} | {b'AD', b'LO', b'L2', b'L3', b'L4', b'L5', b'L6'}
 
-# Valid record type prefixes for continuation detection
-VALID_RECORD_PREFIXES = set(RECORD_TYPES.keys()) | {'AD', 'LO', 'L2', 'L3', 'L4', 'L5', 'L6'}
+# Split limits while scanning, by record type: HD is read up to field 5 (callsign,
+# status) for license selection; every other type only needs the USI at field 1
+SCAN_MAXSPLIT = {'HD': 6}
+SCAN_MAXSPLIT_DEFAULT = 2
 
 # =============================================================================
 # ANONYMIZATION - Fake data pools for PII scrubbing
@@ -72,69 +83,76 @@ AMATEUR_PREFIXES_2LETTER = ["KA", "KB", "KC", "KD", "KE", "KF", "KG", "KI", "KJ"
                              "WA", "WB", "WD", "WE", "WF", "WG", "WH", "WI", "WJ", "WK",
                              "NA", "NB", "NC", "ND", "NE", "NF", "NG", "NI", "NJ", "NK",
                              "AA", "AB", "AC", "AD", "AE", "AF", "AG", "AI", "AJ", "AK"]
+GMRS_PREFIXES = ["WP", "WQ", "WR", "WS"]
+
+# Amateur formats: (prefix pool, suffix length) -> 1x2, 1x3, 2x1, 2x2, 2x3
+AMATEUR_FORMATS = [
+    (AMATEUR_PREFIXES_1LETTER, 2),  # K0AA
+    (AMATEUR_PREFIXES_1LETTER, 3),  # K0AAA
+    (AMATEUR_PREFIXES_2LETTER, 1),  # AA0A
+    (AMATEUR_PREFIXES_2LETTER, 2),  # AA0AA
+    (AMATEUR_PREFIXES_2LETTER, 3),  # AA0AAA
+]
+
+# Callsign letter runs indexed by base-26 digits, so a suffix is a single lookup
+LETTER_PAIRS = [a + b for a in ascii_uppercase for b in ascii_uppercase]
+LETTER_TRIPLES = [pair + c for pair in LETTER_PAIRS for c in ascii_uppercase]
+
+# Salts deriving independent per-purpose hashes from a single hash of the USI
+HASH_SALT_CALLSIGN = 0x9E3779B97F4A7C15
+HASH_SALT_GMRS_CALLSIGN = 0xC2B2AE3D27D4EB4F
+HASH_SALT_NAME = 0x165667B19E3779F9
+HASH_SALT_ADDRESS = 0xD6E8FEB86659FD93
+HASH_SALT_FRN = 0xFF51AFD7ED558CCD
+HASH_SALT_COMMENT = 0xC4CEB9FE1A85EC53
 
-def generate_amateur_callsign(usi: str, index: int) -> str:
+
+def usi_hash(usi: bytes, salt: int) -> int:
+    """Derive a well-mixed 64-bit hash of a USI for one purpose (splitmix64 finalizer)."""
+    h = (hash(usi) ^ salt) & 0xFFFFFFFFFFFFFFFF
+    h = ((h ^ (h >> 30)) * 0xBF58476D1CE4E5B9) & 0xFFFFFFFFFFFFFFFF
+    h = ((h ^ (h >> 27)) * 0x94D049BB133111EB) & 0xFFFFFFFFFFFFFFFF
+    return h ^ (h >> 31)
+
+
+def generate_amateur_callsign(usi: bytes, index: int) -> str:
     """Generate a valid amateur callsign (letter-digit-letter pattern).
     
     Formats: 1x2, 1x3, 2x1, 2x2, 2x3
     """
-    h = hash((usi, index, "callsign"))
-    fmt = h % 5
-    digit = str(h % 10)
-    
-    if fmt == 0:  # 1x2: K0AA
-        prefix = AMATEUR_PREFIXES_1LETTER[h % len(AMATEUR_PREFIXES_1LETTER)]
-        suffix = chr(65 + (h >> 4) % 26) + chr(65 + (h >> 8) % 26)
-        return f"{prefix}{digit}{suffix}"
-    elif fmt == 1:  # 1x3: K0AAA
-        prefix = AMATEUR_PREFIXES_1LETTER[h % len(AMATEUR_PREFIXES_1LETTER)]
-        suffix = chr(65 + (h >> 4) % 26) + chr(65 + (h >> 8) % 26) + chr(65 + (h >> 12) % 26)
-        return f"{prefix}{digit}{suffix}"
-    elif fmt == 2:  # 2x1: AA0A
-        prefix = AMATEUR_PREFIXES_2LETTER[h % len(AMATEUR_PREFIXES_2LETTER)]
-        suffix = chr(65 + (h >> 4) % 26)
-        return f"{prefix}{digit}{suffix}"
-    elif fmt == 3:  # 2x2: AA0AA
-        prefix = AMATEUR_PREFIXES_2LETTER[h % len(AMATEUR_PREFIXES_2LETTER)]
-        suffix = chr(65 + (h >> 4) % 26) + chr(65 + (h >> 8) % 26)
-        return f"{prefix}{digit}{suffix}"
-    else:  # 2x3: AA0AAA
-        prefix = AMATEUR_PREFIXES_2LETTER[h % len(AMATEUR_PREFIXES_2LETTER)]
-        suffix = chr(65 + (h >> 4) % 26) + chr(65 + (h >> 8) % 26) + chr(65 + (h >> 12) % 26)
-        return f"{prefix}{digit}{suffix}"
-
-
-def generate_gmrs_callsign(usi: str, index: int) -> str:
+    h = usi_hash(usi, HASH_SALT_CALLSIGN + index)
+    prefixes, suffix_len = AMATEUR_FORMATS[h % 5]
+    prefix = prefixes[h % len(prefixes)]
+    suffix = LETTER_TRIPLES[(h >> 4) % 26 * 676 + (h >> 8) % 26 * 26 + (h >> 12) % 26]
+    return f"{prefix}{h % 10}{suffix[:suffix_len]}"
+
+
+def generate_gmrs_callsign(usi: bytes, index: int) -> str:
     """Generate a valid GMRS callsign (all letters then all digits).
     
     Formats: 3x4 (KAA1234) or 4x3 (WQFX467)
     """
-    h = hash((usi, index, "gmrs_callsign"))
-    fmt = h % 2
+    h = usi_hash(usi, HASH_SALT_GMRS_CALLSIGN + index)
+    letters = LETTER_PAIRS[(h >> 4) % 26 * 26 + (h >> 8) % 26]
     
-    if fmt == 0:  # 3x4: KAA1234 (legacy)
-        letters = "K" + chr(65 + (h >> 4) % 26) + chr(65 + (h >> 8) % 26)
-        digits = f"{(h >> 12) % 10000:04d}"
-        return f"{letters}{digits}"
+    if h % 2 == 0:  # 3x4: KAA1234 (legacy)
+        return f"K{letters}{(h >> 12) % 10000:04d}"
     else:  # 4x3: WQFX467 (modern)
-        prefix = ["WP", "WQ", "WR", "WS"][h % 4]
-        letters = prefix + chr(65 + (h >> 4) % 26) + chr(65 + (h >> 8) % 26)
-        digits = f"{(h >> 12) % 1000:03d}"
-        return f"{letters}{digits}"
+        return f"{GMRS_PREFIXES[h % 4]}{letters}{(h >> 12) % 1000:03d}"
 
 
-def generate_fake_name(usi: str) -> tuple[str, str, str]:
+def generate_fake_name(usi: bytes) -> tuple[str, str, str]:
     """Generate a fake name (first, middle initial, last)."""
-    h = hash((usi, "name"))
+    h = usi_hash(usi, HASH_SALT_NAME)
     first = FIRST_NAMES[h % len(FIRST_NAMES)]
     middle = chr(65 + (h >> 8) % 26)
     last = LAST_NAMES[(h >> 4) % len(LAST_NAMES)]
     return first, middle, last
 
 
-def generate_fake_address(usi: str) -> tuple[str, str, str, str]:
+def generate_fake_address(usi: bytes) -> tuple[str, str, str, str]:
     """Generate a fake address (street, city, state, zip)."""
-    h = hash((usi, "address"))
+    h = usi_hash(usi, HASH_SALT_ADDRESS)
     street = f"{h % 9999 + 1} MAIN ST"
     city = CITIES[h % len(CITIES)]
     state = STATES[(h >> 4) % len(STATES)]
@@ -142,209 +160,310 @@ def generate_fake_address(usi: str) -> tuple[str, str, str, str]:
     return street, city, state, zip_code
 
 
-def generate_fake_frn(usi: str) -> str:
+def generate_fake_frn(usi: bytes) -> str:
     """Generate a fake FRN (10 digits starting with 000)."""
-    h = hash((usi, "frn"))
+    h = usi_hash(usi, HASH_SALT_FRN)
     return f"000{h % 10000000:07d}"
 
 
-def anonymize_record(raw_line: str, service_code: str, usi_callsign_map: dict[str, str]) -> str:
-    """Anonymize a single record line, replacing PII with fake data.
+# Per-record-type anonymization plan: (field index, action, only if field is non-empty).
+# 'callsign' uses the USI's fake callsign, 'clear' blanks the field,
+# 'callsign_if_looks_like' replaces short alphanumeric values, and any other
+# action names a fake_identity() value.
+ANON_PLAN: dict[bytes, tuple[tuple[int, str, bool], ...]] = {
+    # HD: callsign at index 4, names at various positions (around indices 28-32)
+    b'HD': ((4, 'callsign', False),
+            (28, 'clear', True), (29, 'clear', True), (30, 'clear', True),
+            (31, 'clear', True), (32, 'clear', True)),
+    # EN: callsign at 4, entity_name at 7, first/middle/last at 8-10, phone at 12,
+    #     email at 14, street at 15, city at 16, state at 17, zip at 18, frn at 22
+    b'EN': ((4, 'callsign', False), (7, 'entity', False),
+            (8, 'first', False), (9, 'middle', False), (10, 'last', False),
+            (12, 'phone', True), (14, 'email', True), (15, 'street', True),
+            (16, 'city', True), (17, 'state', True), (18, 'zip', True), (22, 'frn', True)),
+    # AM: callsign at index 4
+    b'AM': ((4, 'callsign', False),),
+    # CO: callsign at index 3, comment text at index 5
+    b'CO': ((3, 'callsign', False), (5, 'comment', True)),
+    # These have callsign at index 3 or 4
+    **dict.fromkeys((b'HS', b'SC', b'SF', b'LA'),
+                    ((3, 'callsign_if_looks_like', True), (4, 'callsign_if_looks_like', True))),
+}
+
+# Short (at most 10 bytes) values mixing letters and digits look like callsigns
+CALLSIGN_LIKE = re.compile(rb'(?=.*[0-9])(?=.*[A-Za-z]).{1,10}', re.DOTALL).fullmatch
+
+# Multi-line comments in FCC data have continuation lines that don't start with a record type
+MULTILINE_COMMENT = (b"This is a multi-line test comment that spans multiple lines.\n"
+                     b"CONTINUATION: This line tests the continuation handling in the parser.")
+
+
+class FakeIdentity:
+    """Fake PII for one USI, encoded once; attribute names are ANON_PLAN actions."""
+    
+    __slots__ = ('entity', 'first', 'middle', 'last', 'phone', 'email',
+                 'street', 'city', 'state', 'zip', 'frn', 'comment')
+    
+    def __init__(self, usi: bytes):
+        first, middle, last = generate_fake_name(usi)
+        street, city, state, zip_code = generate_fake_address(usi)
+        self.entity = f"{last}, {first} {middle}".encode()
+        self.first = first.encode()
+        self.middle = middle.encode()
+        self.last = last.encode()
+        self.phone = b"555-555-0100"
+        self.email = b"test@example.com"
+        self.street = street.encode()
+        self.city = city.encode()
+        self.state = state.encode()
+        self.zip = zip_code.encode()
+        self.frn = generate_fake_frn(usi).encode()
+        # Every 5th comment is multi-line, to preserve the continuation edge case
+        if usi_hash(usi, HASH_SALT_COMMENT) % 5 == 0:
+            self.comment = MULTILINE_COMMENT
+        else:
+            self.comment = b"Test comment for fixture data."
+
+
+@functools.lru_cache(maxsize=None)
+def fake_identity(usi: bytes) -> FakeIdentity:
+    """The FakeIdentity for a USI, built once and shared between calls."""
+    return FakeIdentity(usi)
+
+
+def anonymize_record(record_type: bytes, fields: list[bytes], service_code: str,
+                     usi_callsign_map: dict[bytes, bytes]) -> bytes:
+    """Anonymize a single parsed record, replacing PII with fake data.
+    
+    Records stay raw latin-1 bytes; all fake values are ASCII.
     
     Args:
-        raw_line: The original pipe-delimited record line
+        record_type: The record type, as returned by parse_dat_line
+        fields: All fields of the record; modified in place
         service_code: 'HA'/'HV' for amateur, 'ZA' for GMRS
         usi_callsign_map: Mapping from USI to consistent fake callsign
     
     Returns:
-        Anonymized record line
+        Anonymized pipe-delimited record line, without a line terminator
     """
-    record_type, fields = parse_dat_line(raw_line)
     if len(fields) < 2:
-        return raw_line
+        return b'|'.join(fields)
     
-    usi = fields[1] if len(fields) > 1 else ""
+    usi = fields[1] if len(fields) > 1 else b""
     
     # Get or generate consistent callsign for this USI
     if usi not in usi_callsign_map:
         index = len(usi_callsign_map)
         if service_code == 'ZA':
-            usi_callsign_map[usi] = generate_gmrs_callsign(usi, index)
+            usi_callsign_map[usi] = generate_gmrs_callsign(usi, index).encode()
         else:  # HA, HV
-            usi_callsign_map[usi] = generate_amateur_callsign(usi, index)
+            usi_callsign_map[usi] = generate_amateur_callsign(usi, index).encode()
     
     fake_callsign = usi_callsign_map[usi]
-    first, middle, last = generate_fake_name(usi)
-    street, city, state, zip_code = generate_fake_address(usi)
-    fake_frn = generate_fake_frn(usi)
-    
-    # Anonymize based on record type
-    if record_type == 'HD':
-        # HD: callsign at index 4, names at various positions (30+)
-        if len(fields) > 4:
-            fields[4] = fake_callsign
-        # Clear name fields in HD if present (around indices 28-35)
-        for i in [28, 29, 30, 31, 32]:
-            if i < len(fields) and fields[i]:
-                fields[i] = ""
-    
-    elif record_type == 'EN':
-        # EN: callsign at 4, entity_name at 7, first/middle/last at 8-10, 
-        #     street at 15, city at 16, state at 17, zip at 18, email at 14, phone at 12, frn at 22
-        if len(fields) > 4:
-            fields[4] = fake_callsign
-        if len(fields) > 7:
-            fields[7] = f"{last}, {first} {middle}"  # Entity name
-        if len(fields) > 8:
-            fields[8] = first
-        if len(fields) > 9:
-            fields[9] = middle
-        if len(fields) > 10:
-            fields[10] = last
-        if len(fields) > 12 and fields[12]:  # Phone
-            fields[12] = "555-555-0100"
-        if len(fields) > 14 and fields[14]:  # Email
-            fields[14] = "test@example.com"
-        if len(fields) > 15 and fields[15]:  # Street
-            fields[15] = street
-        if len(fields) > 16 and fields[16]:  # City
-            fields[16] = city
-        if len(fields) > 17 and fields[17]:  # State
-            fields[17] = state
-        if len(fields) > 18 and fields[18]:  # Zip
-            fields[18] = zip_code
-        if len(fields) > 22 and fields[22]:  # FRN
-            fields[22] = fake_frn
-    
-    elif record_type == 'AM':
-        # AM: callsign at index 4
-        if len(fields) > 4:
-            fields[4] = fake_callsign
-    
-    elif record_type == 'CO':
-        # CO: callsign at index 3, comment text at index 5
-        if len(fields) > 3:
-            fields[3] = fake_callsign
-        if len(fields) > 5 and fields[5]:
-            # Generate multi-line comment for some records to preserve edge case
-            # Multi-line comments in FCC data have continuation lines that don't start with a record type
-            h = hash((usi, "comment_multiline"))
-            if h % 5 == 0:  # Every 5th comment is multi-line
-                fields[5] = "This is a multi-line test comment that spans multiple lines.\n" + \
-                            "CONTINUATION: This line tests the continuation handling in the parser."
-            else:
-                fields[5] = "Test comment for fixture data."
-    
-    elif record_type in ('HS', 'SC', 'SF', 'LA'):
-        # These have callsign at index 3 or 4
-        for i in [3, 4]:
-            if i < len(fields) and fields[i] and len(fields[i]) <= 10:
-                # Looks like a callsign field
-                if any(c.isdigit() for c in fields[i]) and any(c.isalpha() for c in fields[i]):
-                    fields[i] = fake_callsign
-    
-    return '|'.join(fields)
-
-
-
-def parse_dat_line(line: str) -> tuple[str, list[str]]:
-    """Parse a pipe-delimited DAT line, returning record type and fields."""
-    fields = line.rstrip('\r\n').split('|')
-    record_type = fields[0] if fields else ''
-    return record_type, fields
+    identity = fake_identity(usi)
+    
+    n = len(fields)
+    for i, action, only_if_set in ANON_PLAN.get(record_type, ()):
+        if i >= n or (only_if_set and not fields[i]):
+            continue
+        if action == 'callsign':
+            fields[i] = fake_callsign
+        elif action == 'clear':
+            fields[i] = b""
+        elif action == 'callsign_if_looks_like':
+            if CALLSIGN_LIKE(fields[i]):
+                fields[i] = fake_callsign
+        else:
+            fields[i] = getattr(identity, action)
+    
+    return b'|'.join(fields)
 
 
-def get_usi(record_type: str, fields: list[str]) -> str | None:
-    """Extract the unique_system_identifier from a record."""
-    pos = RECORD_TYPES.get(record_type, 1)
-    if len(fields) > pos:
-        return fields[pos]
-    return None
+def parse_dat_line(line: bytes, maxsplit: int = -1) -> tuple[bytes, list[bytes]]:
+    """Parse a raw pipe-delimited DAT line, returning record type and fields.
+    
+    With maxsplit set, the last field holds the unsplit remainder of the line.
+    """
+    fields = line.rstrip(b'\r\n').split(b'|', maxsplit)
+    record_type = fields[0] if fields else b''
+    return record_type, fields
 
 
-def read_dat_from_zip(zip_path: Path, dat_name: str) -> list[tuple[str, list[str], str]]:
-    """Read a DAT file from inside a ZIP and return records."""
-    records = []
+def iter_line_blocks(f: BinaryIO, block_size: int = 1 << 20) -> Iterator[list[bytes]]:
+    """Yield the lines of a binary stream in batches, splitting each large block in C.
     
+    Lines are yielded without their trailing '\n'.
+    """
+    tail = b''
+    while block := f.read(block_size):
+        lines = (tail + block).split(b'\n')
+        tail = lines.pop()
+        yield lines
+    if tail:
+        yield [tail]
+
+
+def iter_dat_from_zip(zf: zipfile.ZipFile, members: dict[str, zipfile.ZipInfo],
+                      dat_name: str, log: list[str]) -> Iterator[tuple[bytes, list[bytes], bytes]]:
+    """Stream raw records of a DAT file inside an open ZIP, one record at a time.
+    
+    Records stay undecoded bytes (latin-1 on disk) all the way to the output files.
+    Fields are only split as far as SCAN_MAXSPLIT needs for the file's record type;
+    use the raw line for the full record.
+    members maps member names to their ZipInfo, built once per archive.
+    Read errors end the stream and are appended to log as a warning.
+    """
+    # Local bindings for the per-line loop, which stays within C-level bytes methods
+    valid = VALID_RECORD_PREFIXES
+    maxsplit = SCAN_MAXSPLIT.get(dat_name.partition('.')[0], SCAN_MAXSPLIT_DEFAULT)
     try:
-        with zipfile.ZipFile(zip_path, 'r') as zf:
-            if dat_name not in zf.namelist():
-                return records
-            
-            with zf.open(dat_name) as f:
-                pending_line = None
-                for raw_line in f:
-                    line = raw_line.decode('latin-1', errors='replace')
-                    if not line.strip():
+        if dat_name not in members:
+            return
+        
+        with zf.open(members[dat_name]) as f:
+            # Pending record; pending_fields is None once continuation lines are merged
+            pending_type = pending_fields = pending_line = None
+            for lines in iter_line_blocks(f):
+                for line in lines:
+                    if not line or line.isspace():
                         continue
-                    
-                    record_type, fields = parse_dat_line(line)
-                    
+                
+                    fields = line.rstrip(b'\r\n').split(b'|', maxsplit)
+                    record_type = fields[0]
+                
                     # Check if this is a continuation line
-                    if record_type and record_type not in VALID_RECORD_PREFIXES:
-                        if pending_line:
-                            pending_line = pending_line.rstrip('\r\n') + ' ' + line.strip()
+                    if record_type and record_type not in valid:
+                        if pending_line is not None:
+                            pending_line = pending_line.rstrip(b'\r\n') + b' ' + line.strip()
+                            pending_fields = None
                         continue
-                    
-                    if pending_line:
-                        pt, pf = parse_dat_line(pending_line)
-                        records.append((pt, pf, pending_line))
-                    
-                    pending_line = line
                 
-                if pending_line:
-                    pt, pf = parse_dat_line(pending_line)
-                    records.append((pt, pf, pending_line))
+                    if pending_line is not None:
+                        if pending_fields is None:
+                            pending_type, pending_fields = parse_dat_line(pending_line, maxsplit)
+                        yield pending_type, pending_fields, pending_line
+                
+                    pending_type, pending_fields, pending_line = record_type, fields, line
+            
+            if pending_line is not None:
+                if pending_fields is None:
+                    pending_type, pending_fields = parse_dat_line(pending_line, maxsplit)
+                yield pending_type, pending_fields, pending_line
     except Exception as e:
-        print(f"  Warning: Could not read {dat_name} from {zip_path}: {e}")
-    
-    return records
+        log.append(f"  Warning: Could not read {dat_name} from {zf.filename}: {e}")
 
 
-def select_sample_licenses(hd_records: list[tuple[str, list[str], str]], 
-                           service_name: str,
-                           count: int = 50,
-                           seed: int = 42) -> set[str]:
-    """Select a deterministic set of license USIs covering various cases."""
-    random.seed(seed + hash(service_name))
+def select_sample_licenses(hd_records: Iterable[tuple[bytes, list[bytes], bytes]],
+                           rng: random.Random,
+                           count: int = 50) -> set[bytes]:
+    """Select a deterministic set of license USIs covering various cases.
     
-    by_status = defaultdict(list)
+    Each status is reservoir-sampled during a single pass, so only O(count) USIs
+    are held regardless of the size of HD.dat. Algorithm L precomputes how many
+    records to skip before the next replacement, so random numbers are only drawn
+    for records that are actually taken.
+
+    Small counts leave some statuses without a reservoir (python -m doctest):
+
+    >>> hd = [(b'HD', [b'HD', b'%d' % i, b'', b'', b'K%dX' % i, b'AEC'[i % 3:i % 3 + 1]], b'')
+    ...       for i in range(1000)]
+    >>> [len(select_sample_licenses(hd, random.Random(0), count=n)) for n in (1, 5, 9)]
+    [0, 4, 7]
+    """
+    # Known callsigns for verification
+    known_callsigns = {
+        b'W1AW', b'W3LPL', b'K5ZD', b'N1MM',  # Amateur
+        b'WRCK692', b'WQRZ855',  # GMRS examples
+    }
     by_callsign = {}
     
+    # Reservoirs sized for the largest possible per-status target; a status whose
+    # target rounds down to zero is never sampled
+    capacities = {status: capacity
+                  for status, capacity in ((b'A', int(count * 0.7)), (b'E', int(count * 0.2)),
+                                           (b'C', int(count * 0.1)))
+                  if capacity > 0}
+    reservoirs = {status: [] for status in capacities}
+    seen = dict.fromkeys(capacities, 0)
+    weights = dict.fromkeys(capacities, 1.0)
+    next_take = {}
+    
+    def schedule(status: bytes, index: int) -> None:
+        # Algorithm L: shrink the weight, then skip a geometric number of records.
+        # Only statuses with a positive capacity get a reservoir, so none divides by zero.
+        weights[status] *= math.exp(-rng.expovariate(1.0) / capacities[status])
+        log_keep = math.log1p(-weights[status]) if weights[status] < 1.0 else -math.inf
+        if log_keep == 0.0:
+            # Weight too small to ever replace another record
+            next_take[status] = math.inf
+        else:
+            next_take[status] = index + 1 + math.floor(-rng.expovariate(1.0) / log_keep)
+    
     for record_type, fields, raw in hd_records:
         if len(fields) > 5:
-            status = fields[5] if len(fields) > 5 else 'A'
-            usi = fields[1] if len(fields) > 1 else None
-            callsign = fields[4] if len(fields) > 4 else None
-            if usi:
-                by_status[status].append(usi)
-                if callsign:
-                    by_callsign[callsign] = usi
-    
-    selected = set()
-    
-    # Known callsigns for verification
-    known_callsigns = {
-        'W1AW', 'W3LPL', 'K5ZD', 'N1MM',  # Amateur
-        'WRCK692', 'WQRZ855',  # GMRS examples
-    }
-    for callsign in known_callsigns:
-        if callsign in by_callsign:
-            selected.add(by_callsign[callsign])
+            usi = fields[1]
+            if not usi:
+                continue
+            if fields[4] in known_callsigns:
+                by_callsign[fields[4]] = usi
+                continue
+            
+            status = fields[5]
+            reservoir = reservoirs.get(status)
+            if reservoir is None:
+                continue
+            index = seen[status]
+            seen[status] = index + 1
+            if index < capacities[status]:
+                reservoir.append(usi)
+                if index + 1 == capacities[status]:
+                    schedule(status, index)
+            elif index == next_take[status]:
+                reservoir[rng.randrange(capacities[status])] = usi
+                schedule(status, index)
+    
+    selected = set(by_callsign.values())
     
     # Sample from each status
     remaining = count - len(selected)
-    status_counts = {'A': int(remaining * 0.7), 'E': int(remaining * 0.2), 'C': int(remaining * 0.1)}
+    status_counts = {b'A': int(remaining * 0.7), b'E': int(remaining * 0.2), b'C': int(remaining * 0.1)}
     
     for status, target in status_counts.items():
-        available = [usi for usi in by_status.get(status, []) if usi not in selected]
-        if available:
-            sample = random.sample(available, min(target, len(available)))
-            selected.update(sample)
+        reservoir = reservoirs.get(status, [])
+        if len(reservoir) > target:
+            reservoir = rng.sample(reservoir, target)
+        selected.update(reservoir)
     
     return selected
 
 
+def sample_distinct(items: Iterable[bytes], k: int, rng: random.Random) -> list[bytes]:
+    """Uniformly sample up to k distinct items from a stream in O(k) memory.
+    
+    Bottom-k sampling: keeps the k items with the smallest salted hash, so items
+    repeated across records (e.g. many HS rows per USI) never skew the sample.
+    """
+    if k <= 0:
+        return []
+    salt = rng.randbytes(8)
+    chosen = {}
+    worst = worst_key = None
+    for item in items:
+        if item in chosen:
+            continue
+        key = hash(item + salt)
+        if len(chosen) < k:
+            chosen[item] = key
+            if worst is None or key > worst_key:
+                worst, worst_key = item, key
+        elif key < worst_key:
+            del chosen[worst]
+            chosen[item] = key
+            worst = max(chosen, key=chosen.__getitem__)
+            worst_key = chosen[worst]
+    return list(chosen)
+
+
 def extract_service(zip_path: Path, output_dir: Path, count: int = 50, seed: int = 42) -> dict:
     """Extract fixture from a single service ZIP file."""
     service_name = zip_path.stem  # e.g., 'l_amat' or 'l_gmrs'
@@ -355,64 +474,89 @@ def extract_service(zip_path: Path, output_dir: Path, count: int = 50, seed: int
     else:
         service_code = 'HA'  # Default to amateur
     
-    print(f"\nProcessing {service_name} (service_code={service_code})...")
-    
-    # Read all record types
-    all_records = {}
-    for rt in RECORD_TYPES:
-        dat_name = f"{rt}.dat"
-        records = read_dat_from_zip(zip_path, dat_name)
-        if records:
-            all_records[rt] = records
-            print(f"  {dat_name}: {len(records)} records")
-    
-    if 'HD' not in all_records:
-        print(f"  Skipping {service_name}: no HD.dat found")
-        return {}
-    
-    # Select sample licenses
-    selected_usis = select_sample_licenses(all_records['HD'], service_name, count=count, seed=seed)
-    print(f"  Selected {len(selected_usis)} licenses")
-    
-    # Enrich with edge cases
-    for rt in ['CO', 'HS', 'SC']:
-        if rt in all_records:
-            rt_usis = {get_usi(rt, fields) for _, fields, _ in all_records[rt]}
-            extra = random.sample(list(rt_usis - selected_usis), min(5, len(rt_usis - selected_usis)))
-            selected_usis.update(extra)
-    
-    # Create USI-to-callsign mapping for consistent anonymization
-    usi_callsign_map = {}
-    
-    # Extract and anonymize related records
-    output_records = defaultdict(list)
-    for record_type, records in all_records.items():
-        for rt, fields, raw in records:
-            usi = get_usi(rt, fields)
-            if usi in selected_usis:
-                # Anonymize before adding
-                anonymized = anonymize_record(raw, service_code, usi_callsign_map)
-                output_records[record_type].append(anonymized)
-    
-    # Write output files
-    service_output_dir = output_dir / service_name
-    service_output_dir.mkdir(parents=True, exist_ok=True)
-    
-    stats = {}
-    for record_type, lines in output_records.items():
-        output_path = service_output_dir / f"{record_type}.dat"
-        with open(output_path, 'w', encoding='latin-1') as f:
-            for line in lines:
-                if not line.endswith('\n'):
-                    line += '\n'
-                f.write(line)
-        stats[record_type] = len(lines)
-        print(f"  Wrote {record_type}.dat: {len(lines)} records")
-    
-    return stats
-
-
-def extract_fixture(cache_dir: Path, output_dir: Path, count: int = 50, seed: int = 42):
+    # Workers run concurrently, so progress is collected and written in one
+    # piece rather than interleaved line by line with other services
+    log = [f"\nProcessing {service_name} (service_code={service_code})..."]
+    try:
+        # Per-service generator: worker processes must not share global random state
+        rng = random.Random(seed + hash(service_name))
+        
+        try:
+            zf = zipfile.ZipFile(zip_path, 'r')
+            # Scan the central directory once for all DAT lookups
+            members = {zi.filename: zi for zi in zf.infolist()}
+        except (zipfile.BadZipFile, OSError) as e:
+            # A broken archive skips only this service, not the whole run
+            log.append(f"  Warning: Could not read {zip_path}: {e}")
+            log.append(f"  Skipping {service_name}: no HD.dat found")
+            return {}
+        
+        with zf:
+            if 'HD.dat' not in members:
+                log.append(f"  Skipping {service_name}: no HD.dat found")
+                return {}
+            
+            # Pass 1: select sample licenses from a single streamed HD.dat scan
+            selected_usis = select_sample_licenses(iter_dat_from_zip(zf, members, 'HD.dat', log), rng, count=count)
+            # An HD.dat with no readable records leaves nothing to anchor the fixture
+            # on; it was already reported above, so the recheck discards its warnings
+            if not selected_usis and next(iter_dat_from_zip(zf, members, 'HD.dat', []), None) is None:
+                log.append(f"  Skipping {service_name}: no HD.dat found")
+                return {}
+            log.append(f"  Selected {len(selected_usis)} licenses")
+            
+            # Enrich with edge cases
+            for rt in ['CO', 'HS', 'SC']:
+                extra_pool = (usi for _, fields, _ in iter_dat_from_zip(zf, members, f"{rt}.dat", log)
+                              if (usi := (fields[1] if len(fields) > 1 else None))
+                              and usi not in selected_usis)
+                selected_usis.update(sample_distinct(extra_pool, 5, rng))
+            
+            selected_usis = frozenset(selected_usis)
+            
+            # Create USI-to-callsign mapping for consistent anonymization
+            usi_callsign_map = {}
+            
+            # Pass 2: stream every DAT, writing anonymized related records as they are found
+            service_output_dir = output_dir / service_name
+            service_output_dir.mkdir(parents=True, exist_ok=True)
+            
+            stats = {}
+            for record_type in RECORD_TYPES:
+                dat_name = f"{record_type}.dat"
+                total = kept = 0
+                writer = None
+                try:
+                    for rt, fields, _ in iter_dat_from_zip(zf, members, dat_name, log):
+                        total += 1
+                        usi = fields[1] if len(fields) > 1 else None
+                        if usi in selected_usis:
+                            # Only record types with related records get an output file
+                            if writer is None:
+                                writer = open(service_output_dir / dat_name, 'wb', buffering=1 << 20)
+                            # Anonymize before writing; kept records only need their
+                            # unsplit remainder split, the leading fields are reused
+                            all_fields = fields[:-1] + fields[-1].split(b'|')
+                            anonymized = anonymize_record(rt, all_fields, service_code, usi_callsign_map)
+                            writer.write(anonymized + b'\n')
+                            kept += 1
+                finally:
+                    if writer is not None:
+                        writer.close()
+                if total:
+                    log.append(f"  {dat_name}: {total} records")
+                if kept:
+                    stats[record_type] = kept
+                    log.append(f"  Wrote {dat_name}: {kept} records")
+        
+        return stats
+    finally:
+        sys.stdout.write('\n'.join(log) + '\n')
+        sys.stdout.flush()
+
+
+def extract_fixture(cache_dir: Path, output_dir: Path, count: int = 50, seed: int = 42,
+                    jobs: int | None = None):
     """Extract fixtures from all FCC data ZIPs in cache directory."""
     
     output_dir.mkdir(parents=True, exist_ok=True)
@@ -427,35 +571,46 @@ def extract_fixture(cache_dir: Path, output_dir: Path, count: int = 50, seed: in
     for zf in zip_files:
         print(f"  - {zf.name}")
     
+    # Services share no state, so each ZIP is extracted in its own process
     all_stats = {}
-    for zip_path in sorted(zip_files):
-        stats = extract_service(zip_path, output_dir, count=count, seed=seed)
-        if stats:
-            all_stats[zip_path.stem] = stats
+    max_workers = min(len(zip_files), jobs or os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            pool.submit(extract_service, zip_path, output_dir, count=count, seed=seed): zip_path
+            for zip_path in sorted(zip_files)
+        }
+        for future in as_completed(futures):
+            stats = future.result()
+            if stats:
+                all_stats[futures[future].stem] = stats
     
     # Write manifest
     manifest_path = output_dir / 'MANIFEST.md'
+    parts = [
+        "# FCC ULS Test Fixture\n\n",
+        "This directory contains a representative subset of FCC ULS data for testing.\n",
+        "All records are real FCC data with referential integrity preserved.\n\n",
+        "## Generation\n\n",
+        "```bash\n",
+        f"python scripts/extract_test_fixture.py <cache_dir> <output_dir> --count {count}\n",
+        "```\n\n",
+        "## Contents\n\n",
+    ]
+    
+    total = 0
+    for service, stats in sorted(all_stats.items()):
+        parts.append(f"### {service}\n\n")
+        parts.append("| File | Records |\n")
+        parts.append("|------|--------|\n")
+        for rt, count_val in sorted(stats.items()):
+            parts.append(f"| {rt}.dat | {count_val} |\n")
+            total += count_val
+        parts.append("\n")
+    
+    parts.append(f"**Total records:** {total}\n")
+    
     with open(manifest_path, 'w') as f:
-        f.write("# FCC ULS Test Fixture\n\n")
-        f.write("This directory contains a representative subset of FCC ULS data for testing.\n")
-        f.write("All records are real FCC data with referential integrity preserved.\n\n")
-        f.write("## Generation\n\n")
-        f.write("```bash\n")
-        f.write(f"python scripts/extract_test_fixture.py <cache_dir> <output_dir> --count {count}\n")
-        f.write("```\n\n")
-        f.write("## Contents\n\n")
-        
-        total = 0
-        for service, stats in sorted(all_stats.items()):
-            f.write(f"### {service}\n\n")
-            f.write("| File | Records |\n")
-            f.write("|------|--------|\n")
-            for rt, count_val in sorted(stats.items()):
-                f.write(f"| {rt}.dat | {count_val} |\n")
-                total += count_val
-            f.write("\n")
-        
-        f.write(f"**Total records:** {total}\n")
+        f.write(''.join(parts))
     
     print(f"\n✓ Fixture created at {output_dir}")
     print(f"  Total records: {sum(sum(s.values()) for s in all_stats.values())}")
@@ -474,6 +629,8 @@ def main():
                         help='Number of licenses per service to extract (default: 50)')
     parser.add_argument('--seed', type=int, default=42,
                         help='Random seed for deterministic selection (default: 42)')
+    parser.add_argument('--jobs', '-j', type=int, default=None,
+                        help='Number of service ZIPs to extract in parallel (default: CPU count)')
     
     args = parser.parse_args()
     
@@ -481,8 +638,11 @@ def main():
         print(f"Error: Cache directory does not exist: {args.cache_dir}", file=sys.stderr)
         sys.exit(1)
     
-    random.seed(args.seed)
-    extract_fixture(args.cache_dir, args.output_dir, count=args.count, seed=args.seed)
+    if args.jobs is not None and args.jobs < 1:
+        print("Error: --jobs must be at least 1", file=sys.stderr)
+        sys.exit(1)
+    
+    extract_fixture(args.cache_dir, args.output_dir, count=args.count, seed=args.seed, jobs=args.jobs)
 
 
 if __name__ == '__main__':